@@ -15,41 +15,56 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 
+from q1_common import corr_matrix
+
 ROOT = Path(__file__).resolve().parent.parent
 DATA_DIR = ROOT / "data"
 RESULTS_DIR = ROOT / "results"
 XLS_PATH = DATA_DIR / "histretSP.xls"
 if not XLS_PATH.exists():
     XLS_PATH = ROOT.parent / "histretSP.xls"
+# Parsed copy of the "Returns by year" sheet, always kept in data/ (even when the
+# .xls is found at the project root); rebuilt whenever the .xls is newer.
+CACHE_PATH = DATA_DIR / "histretSP.parquet"
+
+ASSET_COLS = ("SP500", "SmallCap", "TBill", "TBond10Y", "Baa", "RealEstate", "Gold")
 
 
 def load_damodaran():
-    """Load Damodaran historical returns from histretSP.xls."""
+    """Load Damodaran historical returns from histretSP.xls (parquet-cached)."""
+    if CACHE_PATH.exists() and (
+        not XLS_PATH.exists() or CACHE_PATH.stat().st_mtime >= XLS_PATH.stat().st_mtime
+    ):
+        return pd.read_parquet(CACHE_PATH)
     if not XLS_PATH.exists():
         raise FileNotFoundError(
             "histretSP.xls not found. Place it in data/ or project root. "
             "Download: https://www.stern.nyu.edu/~adamodar/pc/datasets/histretSP.xls"
         )
-    df = pd.read_excel(XLS_PATH, sheet_name="Returns by year", engine="xlrd", header=19)
-    df = df.iloc[:, :8].copy()
-    df.columns = ["Year", "SP500", "SmallCap", "TBill", "TBond10Y", "Baa", "RealEstate", "Gold"]
-    df["Year"] = pd.to_numeric(df["Year"], errors="coerce")
+    # calamine returns typed cells, so only the Year column (which also holds
+    # the footer labels) needs coercing. The sheet has < 100 years of data;
+    # nrows/usecols stop the reader once the first eight columns are covered.
+    df = pd.read_excel(
+        XLS_PATH, sheet_name="Returns by year", engine="calamine", header=19,
+        usecols="A:H", nrows=200,
+    )
+    df.columns = ["Year", *ASSET_COLS]
+    df = df.assign(Year=pd.to_numeric(df["Year"], errors="coerce"))
     df = df.dropna(subset=["Year"])
-    df = df[df["Year"] >= 1928].copy()
-    for c in ["SP500", "SmallCap", "TBill", "TBond10Y", "Baa", "RealEstate", "Gold"]:
-        df[c] = pd.to_numeric(df[c], errors="coerce")
+    df = df[df["Year"] >= 1928]
     df = df.dropna(how="all", subset=["SP500"])
+    CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(CACHE_PATH, index=False)
     return df
 
 
-def stats_table(df, rf_col="TBill"):
-    """Compute annualized return, vol, Sharpe for each asset."""
-    cols = [c for c in ["SP500", "SmallCap", "TBill", "TBond10Y", "Baa", "RealEstate", "Gold"] if c in df.columns]
-    df_ = df[cols].dropna()
-    n = len(df_)
-    geo_ret = df_[cols].apply(lambda s: (1 + s).prod() ** (1 / n) - 1)
-    vol = df_[cols].std()
-    excess = geo_ret - df_[rf_col].mean()
+def _stats_from_array(arr, cols, rf_col="TBill"):
+    """Annualized return, vol, Sharpe from a complete (no-NaN) year x asset array."""
+    n = len(arr)
+    # Geometric mean via log1p: one reduction over all columns, no overflow in prod().
+    geo_ret = pd.Series(np.exp(np.log1p(arr).sum(axis=0) / n) - 1, index=cols)
+    vol = pd.Series(arr.std(axis=0, ddof=1), index=cols)
+    excess = geo_ret - arr[:, cols.index(rf_col)].mean()
     sharpe = excess / vol.replace(0, np.nan)
     return pd.DataFrame({
         "Annualized_Return": geo_ret,
@@ -58,6 +73,12 @@ def stats_table(df, rf_col="TBill"):
     }).round(4)
 
 
+def stats_table(df, rf_col="TBill"):
+    """Compute annualized return, vol, Sharpe for each asset."""
+    cols = [c for c in ASSET_COLS if c in df.columns]
+    return _stats_from_array(df[cols].dropna().to_numpy(), cols, rf_col)
+
+
 def main():
     df = load_damodaran()
     RESULTS_DIR.mkdir(parents=True, exist_ok=True)
@@ -66,19 +87,24 @@ def main():
     full = df.dropna(subset=["SP500"], how="all")
     last_year = int(full["Year"].max())
     first_year = int(full["Year"].min())
-    df_30 = df[df["Year"] >= last_year - 30].copy()
-    df_prior = df[(df["Year"] >= first_year) & (df["Year"] < last_year - 30)].copy()
-    if len(df_prior) < 5:
+
+    # Pull the asset matrix out once; each period is a row mask over it.
+    cols = [c for c in ASSET_COLS if c in full.columns]
+    arr = full[cols].to_numpy()
+    years = full["Year"].to_numpy()
+    complete = ~np.isnan(arr).any(axis=1)
+    m_30 = years >= last_year - 30
+    m_prior = (years >= first_year) & (years < last_year - 30)
+    if m_prior.sum() < 5:
         mid = first_year + (last_year - first_year) // 2
-        df_30 = df[df["Year"] >= mid].copy()
-        df_prior = df[df["Year"] < mid].copy()
-
-    cols = [c for c in ["SP500", "SmallCap", "TBill", "TBond10Y", "Baa", "RealEstate", "Gold"] if c in df.columns]
-    s_full = stats_table(full)
-    s_30 = stats_table(df_30)
-    s_prior = stats_table(df_prior)
-    corr_full = full[cols].corr().round(3)
-    corr_30 = df_30[cols].corr().round(3)
+        m_30 = years >= mid
+        m_prior = years < mid
+
+    s_full = _stats_from_array(arr[complete], cols)
+    s_30 = _stats_from_array(arr[m_30 & complete], cols)
+    s_prior = _stats_from_array(arr[m_prior & complete], cols)
+    corr_full = corr_matrix(full[cols]).round(3)
+    corr_30 = corr_matrix(full.loc[m_30, cols]).round(3)
 
     s_full.to_csv(RESULTS_DIR / "damodaran_stats_full.csv")
     s_30.to_csv(RESULTS_DIR / "damodaran_stats_last30.csv")
@@ -14,6 +14,8 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 
+from q1_common import corr_matrix, load_mpf_cached
+
 ROOT = Path(__file__).resolve().parent.parent
 DATA_DIR = ROOT / "data"
 RESULTS_DIR = ROOT / "results"
@@ -24,10 +26,9 @@ if not DATA_PATH.exists():
 
 def load_mpf_returns():
     """Load MPF category returns. Use HK (hk_) columns for Hong Kong scheme."""
-    df = pd.read_csv(DATA_PATH)
+    df = load_mpf_cached(DATA_PATH, DATA_DIR)
     hk_cols = [c for c in df.columns if c.startswith("hk_") and c != "hk_year"]
-    df = df[["hk_year"] + hk_cols].copy()
-    df = df.rename(columns={"hk_year": "year"})
+    df = df[["hk_year"] + hk_cols].rename(columns={"hk_year": "year"})
     df = df.set_index("year")
     df.columns = [c.replace("hk_", "") for c in df.columns]
     return df
@@ -35,8 +36,9 @@ def load_mpf_returns():
 
 def summary_stats(df, risk_free_rate_annual=0.02):
     """Compute mean return, volatility, excess return, Sharpe ratio."""
-    mean_ret = df.mean()
-    vol = df.std()
+    a = df.to_numpy(dtype=float)
+    mean_ret = pd.Series(np.nanmean(a, axis=0), index=df.columns)
+    vol = pd.Series(np.nanstd(a, axis=0, ddof=1), index=df.columns)
     excess = mean_ret - risk_free_rate_annual
     sharpe = excess / vol.replace(0, np.nan)
     return pd.DataFrame({
@@ -54,7 +56,7 @@ def main():
     df = load_mpf_returns()
 
     df_full = df
-    df_recent = df.loc[2010:].copy() if 2010 in df.index else df
+    df_recent = df.loc[2010:] if 2010 in df.index else df
     Rf = 0.02
 
     stats_full = summary_stats(df_full, Rf)
@@ -70,7 +72,7 @@ def main():
     stats_alloc_full.to_csv(RESULTS_DIR / "summary_stats_allocation_funds_full.csv")
     stats_alloc_recent.to_csv(RESULTS_DIR / "summary_stats_allocation_funds_2010_2024.csv")
 
-    corr_alloc = alloc_recent.corr().round(3)
+    corr_alloc = corr_matrix(alloc_recent).round(3)
     corr_alloc.to_csv(RESULTS_DIR / "correlation_allocation_funds.csv")
 
 
@@ -11,8 +11,11 @@ Output: ../results/q16_cumulative_global_vs_hk.csv
 """
 
 import pandas as pd
+import numpy as np
 from pathlib import Path
 
+from q1_common import load_mpf_cached
+
 ROOT = Path(__file__).resolve().parent.parent
 DATA_DIR = ROOT / "data"
 RESULTS_DIR = ROOT / "results"
@@ -24,21 +27,21 @@ if not DATA_PATH.exists():
 def main():
     if not DATA_PATH.exists():
         raise FileNotFoundError(f"MPF data not found: {DATA_PATH}")
-    df = pd.read_csv(DATA_PATH)
-    df = df[df["hk_year"] >= 2010].copy()
+    df = load_mpf_cached(DATA_PATH, DATA_DIR)
+    df = df[df["hk_year"] >= 2010]
     years = df["hk_year"].astype(int).tolist()
 
     r_global = df["hk_GlobalEquityLargeCap"].values
     r_hk = df["hk_GreaterChinaEquity"].values
-    cum_global = (1 + r_global).cumprod()
-    cum_hk = (1 + r_hk).cumprod()
-    terminal_global = cum_global[-1]
-    terminal_hk = cum_hk[-1]
+    terminal_global = np.exp(np.log1p(r_global).sum())
+    terminal_hk = np.exp(np.log1p(r_hk).sum())
     n = len(years)
     ann_global = (terminal_global ** (1 / n)) - 1
     ann_hk = (terminal_hk ** (1 / n)) - 1
 
     RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    cum_global = (1 + r_global).cumprod()
+    cum_hk = (1 + r_hk).cumprod()
     out = pd.DataFrame({
         "year": years,
         "cum_global": cum_global,
@@ -19,6 +19,8 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 
+from q1_common import cached_history, load_mpf_cached
+
 ROOT = Path(__file__).resolve().parent.parent
 DATA_DIR = ROOT / "data"
 RESULTS_DIR = ROOT / "results"
@@ -35,31 +37,29 @@ END_YEAR = 2024
 
 def fetch_vt_annual_returns():
     """Fetch VT price history and compute annual (calendar-year) returns."""
-    try:
-        import yfinance as yf
-    except ImportError:
-        raise ImportError("Install yfinance: pip install yfinance")
-
-    vt = yf.Ticker("VT")
-    hist = vt.history(start=f"{START_YEAR}-01-01", end=f"{END_YEAR + 1}-01-01", auto_adjust=True)
+    hist = cached_history("VT", f"{START_YEAR}-01-01", f"{END_YEAR + 1}-01-01", DATA_DIR)
     if hist.empty or len(hist) < 2:
         raise RuntimeError("VT history from yfinance is empty or too short. Check dates and connection.")
 
-    hist = hist.reset_index()
-    if "Datetime" in hist.columns:
-        hist = hist.rename(columns={"Datetime": "Date"})
-    hist["Year"] = pd.to_datetime(hist["Date"]).dt.year
     close_col = "Adj Close" if "Adj Close" in hist.columns else "Close"
-    last_per_year = hist.sort_values("Date").groupby("Year").last().reset_index()
-    last_per_year = last_per_year[last_per_year["Year"].between(START_YEAR, END_YEAR)][["Year", close_col]].sort_values("Year")
-
-    p = last_per_year[close_col].values
+    hist = hist.dropna(subset=[close_col])
+    if not hist.index.is_monotonic_increasing:
+        hist = hist.sort_index()
+
+    # Year-end price = last row of each year: the first hit of each year when
+    # scanning the (date-sorted) year array backwards.
+    year_arr = pd.DatetimeIndex(hist.index).year.to_numpy()
+    year_end, first_from_end = np.unique(year_arr[::-1], return_index=True)
+    last_idx = len(year_arr) - 1 - first_from_end
+    in_range = (year_end >= START_YEAR) & (year_end <= END_YEAR)
+
+    p = hist[close_col].to_numpy()[last_idx[in_range]]
     if len(p) < 2:
         raise RuntimeError("Not enough VT year-end prices to compute returns.")
     rets = (p[1:] / p[:-1]) - 1
-    years = last_per_year["Year"].values[1:].astype(int).tolist()
+    years = year_end[in_range][1:].astype(int).tolist()
     n = len(rets)
-    terminal = (1 + rets).prod()
+    terminal = np.exp(np.log1p(rets).sum())
     ann_return = terminal ** (1 / n) - 1
     return {
         "annual_returns": rets,
@@ -72,9 +72,8 @@ def fetch_vt_annual_returns():
 
 def load_mpf_hk(data_path):
     """Load MPF category returns — HK scheme only (hk_ columns)."""
-    df = pd.read_csv(data_path)
-    df = df[df["hk_year"] >= START_YEAR].copy()
-    df = df[df["hk_year"] <= END_YEAR].copy()
+    df = load_mpf_cached(data_path, DATA_DIR)
+    df = df[df["hk_year"].between(START_YEAR, END_YEAR)]
     return df
 
 
@@ -97,11 +96,9 @@ def main():
     r_global_mpf = df["hk_GlobalEquityLargeCap"].values
     r_hk_equity = df["hk_GreaterChinaEquity"].values
 
-    cum_global_mpf = (1 + r_global_mpf).cumprod()
-    cum_hk = (1 + r_hk_equity).cumprod()
     n_mpf = len(years_mpf)
-    terminal_mpf_global = cum_global_mpf[-1]
-    terminal_hk = cum_hk[-1]
+    terminal_mpf_global = np.exp(np.log1p(r_global_mpf).sum())
+    terminal_hk = np.exp(np.log1p(r_hk_equity).sum())
     ann_mpf_global = (terminal_mpf_global ** (1 / n_mpf)) - 1
     ann_hk = (terminal_hk ** (1 / n_mpf)) - 1
 
@@ -0,0 +1,67 @@
+# BHATI, Abhimanyu, 3036393745
+# KABANI, Sameer, 3036384012
+# VOBBILISETTY, Sai Navyanth, 3036384139
+
+"""
+Shared helpers for the Question 1 scripts.
+
+The MPF category CSV is read by Q1.2, Q1.6 and Q1.7. It is parsed once and kept
+as a parquet file in data/ (even when the CSV was found at the project root);
+later runs read the parquet copy instead.
+corr_matrix is the correlation helper used by Q1.1 and Q1.2, and cached_history
+memoises the yfinance price download used by Q1.7.
+"""
+
+import hashlib
+
+import pandas as pd
+import numpy as np
+from pathlib import Path
+
+
+def load_mpf_cached(data_path, cache_dir):
+    """Load mpf_category_annual_returns.csv via its parquet cache in *cache_dir*.
+
+    The cache is (re)built whenever it is missing or older than the CSV.
+    """
+    data_path = Path(data_path)
+    cache_path = Path(cache_dir) / f"{data_path.stem}.parquet"
+    if cache_path.exists() and cache_path.stat().st_mtime >= data_path.stat().st_mtime:
+        return pd.read_parquet(cache_path)
+    # Explicit dtypes skip type inference: the year is int32, every return float64.
+    dtypes = {c: "float64" for c in pd.read_csv(data_path, nrows=0).columns}
+    dtypes["hk_year"] = "int32"
+    df = pd.read_csv(data_path, dtype=dtypes, engine="pyarrow")
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(cache_path, index=False, compression="zstd")
+    return df
+
+
+def corr_matrix(df):
+    """Pearson correlation of all columns on complete rows, via np.corrcoef.
+
+    Unlike DataFrame.corr this drops incomplete rows once (listwise) rather
+    than pairing observations column by column.
+    """
+    a = df.dropna().to_numpy(dtype=float)
+    c = np.atleast_2d(np.corrcoef(a, rowvar=False))
+    return pd.DataFrame(c, index=df.columns, columns=df.columns)
+
+
+def cached_history(ticker, start, end, cache_dir):
+    """Adjusted daily price history from yfinance, memoised as parquet.
+
+    The cache file is keyed by (ticker, start, end); empty downloads are not cached.
+    """
+    key = hashlib.sha1(f"{ticker}|{start}|{end}".encode()).hexdigest()[:16]
+    cache_path = Path(cache_dir) / f"{ticker}_{key}.parquet"
+    if cache_path.exists():
+        return pd.read_parquet(cache_path)
+    try:
+        import yfinance as yf
+    except ImportError:
+        raise ImportError("Install yfinance: pip install yfinance")
+    hist = yf.Ticker(ticker).history(start=start, end=end, auto_adjust=True)
+    if not hist.empty:
+        hist.to_parquet(cache_path)
+    return hist
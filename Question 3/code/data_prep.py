@@ -15,16 +15,67 @@ JKP   : Optional local CSV from jkpfactors.com / WRDS
 
 Every online source has a fallback: if the download fails the code looks for
 a previously-cached CSV in *cache_dir* (defaults to ``data/output_data/``).
+Yahoo downloads are additionally memoised as parquet under
+``cache_dir/yfinance/`` so repeat runs skip the network entirely.
 """
 
 from __future__ import annotations
 
-from io import BytesIO, StringIO
+import hashlib
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from io import StringIO
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 import requests
 import yfinance as yf
+from requests.adapters import HTTPAdapter
+
+# ── Month-end alignment ─────────────────────────────────────────────────────
+
+def _to_month_end(dates) -> np.ndarray:
+    """Month-end stamps for *dates*, computed on datetime64 values directly.
+
+    Equivalent to ``.dt.to_period("M").dt.to_timestamp("M")`` without
+    building Period objects.
+    """
+    ym = np.asarray(pd.to_datetime(dates), dtype="datetime64[ns]").astype("datetime64[M]")
+    return ((ym + 1).astype("datetime64[D]") - 1).astype("datetime64[ns]")
+
+
+def _last_per_month(s: pd.Series) -> pd.DataFrame:
+    """Last non-null value of a date-indexed series in each calendar month."""
+    ym = np.asarray(pd.to_datetime(s.index), dtype="datetime64[ns]").astype("datetime64[M]")
+    last = s.groupby(ym.view("i8")).last()
+    return pd.DataFrame({
+        "date": _to_month_end(last.index.to_numpy().astype("datetime64[M]")),
+        s.name: last.to_numpy(),
+    })
+
+
+def _pct_change(v: np.ndarray) -> np.ndarray:
+    """Simple period return with a leading NaN, computed on the raw buffer."""
+    v = np.asarray(v, dtype=float)
+    r = np.empty_like(v)
+    r[:1] = np.nan
+    np.divide(v[1:], v[:-1], out=r[1:])
+    r[1:] -= 1.0
+    return r
+
+
+def _outer_join_on_date(parts: list[pd.DataFrame]) -> pd.DataFrame:
+    """Outer-join frames on their ``date`` column in one aligned concat."""
+    parts = [p.set_index("date") for p in parts if not p.empty and "date" in p.columns]
+    if not parts:
+        return pd.DataFrame(columns=["date"])
+    out = pd.concat(parts, axis=1, join="outer").sort_index()
+    return out.rename_axis("date").reset_index()
+
 
 # ── Local file loaders ──────────────────────────────────────────────────────
 
@@ -32,16 +83,14 @@ def load_fund_monthly_returns(xlsx_path: Path) -> pd.DataFrame:
     df = pd.read_excel(xlsx_path)
     df.columns = [str(c).strip().lower() for c in df.columns]
     df = df.rename(columns={"return": "fund_ret", "date": "date"})
-    df["date"] = pd.to_datetime(df["date"])
-    df["date"] = df["date"].dt.to_period("M").dt.to_timestamp("M")
+    df["date"] = _to_month_end(df["date"])
     df = df[["date", "fund_ret"]].dropna().sort_values("date").reset_index(drop=True)
     return df
 
 
 def load_ff5_monthly(parquet_path: Path) -> pd.DataFrame:
     ff = pd.read_parquet(parquet_path)
-    ff["dt"] = pd.to_datetime(ff["dt"])
-    ff["month"] = ff["dt"].dt.to_period("M").dt.to_timestamp("M")
+    ff["month"] = _to_month_end(ff["dt"])
     factor_cols = ["mkt_rf", "smb", "hml", "rmw", "cma", "rf"]
     for col in factor_cols:
         ff[col] = pd.to_numeric(ff[col], errors="coerce")
@@ -67,11 +116,73 @@ def _load_csv_fallback(csv_path: Path) -> pd.DataFrame:
     return df
 
 
+# ── HTTP ────────────────────────────────────────────────────────────────────
+
+def _http_session(pool_size: int = 4) -> requests.Session:
+    """Session whose connection pool can serve *pool_size* concurrent fetches."""
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size))
+    return session
+
+
+def _download_to_tempfile(session: requests.Session, url: str, suffix: str,
+                          timeout: int = 60) -> Path:
+    """Stream *url* into a temporary file and return its path.
+
+    The body never sits in memory as a whole; the caller deletes the file.
+    """
+    with session.get(url, timeout=timeout, stream=True) as r:
+        r.raise_for_status()
+        fd, name = tempfile.mkstemp(suffix=suffix)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in r.iter_content(chunk_size=1 << 16):
+                    f.write(chunk)
+        except BaseException:
+            os.unlink(name)
+            raise
+    return Path(name)
+
+
+# ── Yahoo Finance ───────────────────────────────────────────────────────────
+
+# Older yfinance 0.2.x releases keep download results in shared module state,
+# so concurrent yf.download calls (^SPGSCI on the FRED pool, HFGM in the
+# background) are serialised.
+_YF_LOCK = threading.Lock()
+
+
+def _yf_download(ticker: str, start: str, end: str | None) -> pd.DataFrame:
+    with _YF_LOCK:
+        return yf.download(ticker, start=start, end=end, auto_adjust=True, progress=False)
+
+
+def _cached_yf(ticker: str, start: str, end: str | None = None,
+               cache_dir: Path | None = None) -> pd.DataFrame:
+    """``yf.download`` memoised as a parquet file per (ticker, start, end).
+
+    Open-ended requests (``end=None``) are keyed on today's date, so they are
+    reused for the rest of the day only.  Empty downloads are not cached.
+    """
+    if cache_dir is None:
+        return _yf_download(ticker, start, end)
+
+    key = hashlib.sha1(f"{ticker}|{start}|{end or date.today().isoformat()}".encode()).hexdigest()
+    path = Path(cache_dir) / "yfinance" / f"{ticker.lstrip('^')}_{key[:16]}.parquet"
+    if path.exists():
+        return pd.read_parquet(path)
+    data = _yf_download(ticker, start, end)
+    if not data.empty:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data.to_parquet(path)
+    return data
+
+
 # ── FRED helpers ────────────────────────────────────────────────────────────
 
-def _fetch_fred_csv(series_id: str) -> pd.DataFrame:
+def _fetch_fred_csv(series_id: str, session: requests.Session | None = None) -> pd.DataFrame:
     url = f"https://fred.stlouisfed.org/graph/fredgraph.csv?id={series_id}"
-    r = requests.get(url, timeout=30)
+    r = (session or requests).get(url, timeout=30)
     r.raise_for_status()
     out = pd.read_csv(StringIO(r.text))
     out.columns = ["date", series_id]
@@ -81,45 +192,48 @@ def _fetch_fred_csv(series_id: str) -> pd.DataFrame:
     return out
 
 
-def _fetch_fred_factors(start: str = "2002-01-01") -> pd.DataFrame:
-    usd = _fetch_fred_csv("DTWEXBGS")
-    dgs10 = _fetch_fred_csv("DGS10")
-    hy_oas = _fetch_fred_csv("BAMLH0A0HYM2")
-
-    for df in (usd, dgs10, hy_oas):
-        df["date"] = df["date"].dt.to_period("M").dt.to_timestamp("M")
-
-    usd_m = usd.groupby("date", as_index=False)["DTWEXBGS"].last()
-    dgs10_m = dgs10.groupby("date", as_index=False)["DGS10"].last()
-    hy_m = hy_oas.groupby("date", as_index=False)["BAMLH0A0HYM2"].last()
-
-    usd_m["usd_ret"] = usd_m["DTWEXBGS"].pct_change()
-    dgs10_m["dgs10_chg"] = dgs10_m["DGS10"].diff() / 100.0
-    hy_m["hy_oas_chg"] = hy_m["BAMLH0A0HYM2"].diff() / 100.0
-
-    cmdty = pd.DataFrame(columns=["date", "cmdty_ret"])
+def _fetch_cmdty_returns(start: str, cache_dir: Path | None = None) -> pd.DataFrame:
+    """S&P GSCI monthly returns from Yahoo; empty frame if the download fails."""
     try:
-        c = yf.download("^SPGSCI", start=start, auto_adjust=True, progress=False)
+        c = _cached_yf("^SPGSCI", start=start, cache_dir=cache_dir)
         if not c.empty:
             close = c["Close"].iloc[:, 0] if isinstance(c.columns, pd.MultiIndex) else c["Close"]
-            close = close.rename("close").to_frame()
-            close.index = pd.to_datetime(close.index)
-            close["date"] = close.index.to_period("M").to_timestamp("M")
-            cmdty = (
-                close.groupby("date", as_index=False)["close"]
-                .last()
-                .assign(cmdty_ret=lambda x: x["close"].pct_change())[["date", "cmdty_ret"]]
+            return (
+                _last_per_month(close.rename("close"))
+                .assign(cmdty_ret=lambda x: _pct_change(x["close"]))[["date", "cmdty_ret"]]
             )
     except Exception:
         pass
+    return pd.DataFrame(columns=["date", "cmdty_ret"])
+
+
+def _fetch_fred_factors(start: str = "2002-01-01",
+                        cache_dir: Path | None = None) -> pd.DataFrame:
+    # The three FRED series and the Yahoo GSCI pull are independent I/O.
+    with _http_session() as session, ThreadPoolExecutor(max_workers=4) as ex:
+        cmdty_fut = ex.submit(_fetch_cmdty_returns, start, cache_dir)
+        fred_futs = {
+            sid: ex.submit(_fetch_fred_csv, sid, session)
+            for sid in ("DTWEXBGS", "DGS10", "BAMLH0A0HYM2")
+        }
+        usd = fred_futs["DTWEXBGS"].result()
+        dgs10 = fred_futs["DGS10"].result()
+        hy_oas = fred_futs["BAMLH0A0HYM2"].result()
+        cmdty = cmdty_fut.result()
+
+    usd_m = _last_per_month(usd.set_index("date")["DTWEXBGS"])
+    dgs10_m = _last_per_month(dgs10.set_index("date")["DGS10"])
+    hy_m = _last_per_month(hy_oas.set_index("date")["BAMLH0A0HYM2"])
+
+    usd_m["usd_ret"] = _pct_change(usd_m["DTWEXBGS"])
+    dgs10_m["dgs10_chg"] = np.diff(dgs10_m["DGS10"].to_numpy(), prepend=np.nan) / 100.0
+    hy_m["hy_oas_chg"] = np.diff(hy_m["BAMLH0A0HYM2"].to_numpy(), prepend=np.nan) / 100.0
 
     out = (
         usd_m[["date", "usd_ret"]]
         .merge(dgs10_m[["date", "dgs10_chg"]], on="date", how="outer")
         .merge(hy_m[["date", "hy_oas_chg"]], on="date", how="outer")
-        .merge(cmdty, on="date", how="outer")
-        .sort_values("date")
-        .reset_index(drop=True)
+        .merge(cmdty, on="date", how="outer", sort=True)
     )
     return out[out["date"] >= pd.Timestamp(start)]
 
@@ -135,125 +249,96 @@ _AQR_URLS = {
 }
 
 
-def _parse_aqr_tsmom(raw: bytes) -> pd.DataFrame:
-    xls = pd.ExcelFile(BytesIO(raw))
-    df = pd.read_excel(xls, sheet_name="TSMOM Factors", header=None)
-
-    hdr_idx = None
-    for i in range(min(25, len(df))):
-        if "TSMOM" in [str(v).strip().upper() for v in df.iloc[i] if pd.notna(v)]:
-            hdr_idx = i
-            break
-    if hdr_idx is None:
-        raise ValueError("Could not locate header row in TSMOM sheet")
-
-    col_names = []
-    for j, v in enumerate(df.iloc[hdr_idx]):
-        if pd.notna(v):
-            col_names.append(str(v).strip())
-        elif j == 0:
-            col_names.append("date")
-        else:
-            col_names.append(f"_col{j}")
-    df.columns = col_names
-    df = df.iloc[hdr_idx + 1:].copy()
+def _scan_and_read(xls: pd.ExcelFile, sheet: str, must_have: tuple[str, ...],
+                   rename: dict[str, str]) -> pd.DataFrame:
+    """Read the data block of an AQR sheet whose header row sits below a preamble.
+
+    The header is the first of the top 30 rows containing every label in
+    *must_have* (case-insensitive).  Only the date column and the columns named
+    in *rename* are read back, and they are returned in *rename* order.  Both
+    reads go through the already-open workbook *xls*.
+    """
+    head = pd.read_excel(xls, sheet_name=sheet, header=None, nrows=30)
+    labels = np.char.upper(np.char.strip(head.fillna("").to_numpy().astype(str)))
+    mask = np.logical_and.reduce([(labels == t).any(axis=1) for t in must_have])
+    if not mask.any():
+        raise ValueError(f"Could not locate header row in {sheet}")
+    hdr_idx = int(mask.argmax())
+
+    names = [str(v).strip() if pd.notna(v) else "" for v in head.iloc[hdr_idx]]
+    names = ["date" if n == "DATE" else n for n in names]
+    if "date" not in names and names and names[0] == "":
+        names[0] = "date"  # TSMOM leaves the date column unlabelled
+    usecols = [j for j, n in enumerate(names) if n == "date" or n in rename]
+
+    df = pd.read_excel(xls, sheet_name=sheet, header=None, skiprows=hdr_idx + 1,
+                       usecols=usecols)
+    df = df.set_axis([rename.get(names[j], names[j]) for j in usecols], axis=1)
+    df = df[["date"] + [c for c in rename.values() if c in df.columns]]
     df["date"] = pd.to_datetime(df["date"], errors="coerce")
     df = df.dropna(subset=["date"])
-
-    rename = {"TSMOM": "tsmom", "TSMOM^EQ": "tsmom_eq", "TSMOM^FI": "tsmom_fi",
-              "TSMOM^FX": "tsmom_fx", "TSMOM^CM": "tsmom_cm"}
-    keep = ["date"] + [c for c in rename if c in df.columns]
-    df = df[keep].rename(columns=rename)
-    for c in df.columns:
-        if c != "date":
-            df[c] = pd.to_numeric(df[c], errors="coerce")
-    df["date"] = df["date"].dt.to_period("M").dt.to_timestamp("M")
+    for c in df.columns[1:]:
+        df[c] = pd.to_numeric(df[c], errors="coerce")
+    df["date"] = _to_month_end(df["date"])
     return df.sort_values("date").reset_index(drop=True)
 
 
-def _parse_aqr_vme(raw: bytes) -> pd.DataFrame:
-    xls = pd.ExcelFile(BytesIO(raw))
-    df = pd.read_excel(xls, sheet_name="VME Factors", header=None)
+def _parse_aqr_tsmom(xls: pd.ExcelFile) -> pd.DataFrame:
+    rename = {"TSMOM": "tsmom", "TSMOM^EQ": "tsmom_eq", "TSMOM^FI": "tsmom_fi",
+              "TSMOM^FX": "tsmom_fx", "TSMOM^CM": "tsmom_cm"}
+    return _scan_and_read(xls, "TSMOM Factors", ("TSMOM",), rename)
 
-    hdr_idx = None
-    for i in range(min(30, len(df))):
-        vals = [str(v).strip().upper() for v in df.iloc[i] if pd.notna(v)]
-        if "DATE" in vals and "VAL" in vals:
-            hdr_idx = i
-            break
-    if hdr_idx is None:
-        raise ValueError("Could not locate header row in VME sheet")
-
-    df.columns = [str(v).strip() if pd.notna(v) else f"_col{j}" for j, v in enumerate(df.iloc[hdr_idx])]
-    df = df.iloc[hdr_idx + 1:].copy()
-    df = df.rename(columns={"DATE": "date"})
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    df = df.dropna(subset=["date"])
 
+def _parse_aqr_vme(xls: pd.ExcelFile) -> pd.DataFrame:
     rename = {"VAL": "val_everywhere", "MOM": "mom_everywhere"}
-    keep = ["date"] + [c for c in rename if c in df.columns]
-    df = df[keep].rename(columns=rename)
-    for c in df.columns:
-        if c != "date":
-            df[c] = pd.to_numeric(df[c], errors="coerce")
-    df["date"] = df["date"].dt.to_period("M").dt.to_timestamp("M")
-    return df.sort_values("date").reset_index(drop=True)
+    return _scan_and_read(xls, "VME Factors", ("DATE", "VAL"), rename)
 
 
-def _parse_aqr_country_factor(raw: bytes, sheet: str, col_name: str) -> pd.DataFrame:
-    xls = pd.ExcelFile(BytesIO(raw))
-    df = pd.read_excel(xls, sheet_name=sheet, header=None)
-
-    hdr_idx = None
-    for i in range(min(25, len(df))):
-        vals = [str(v).strip().upper() for v in df.iloc[i] if pd.notna(v)]
-        if "DATE" in vals and "GLOBAL" in vals:
-            hdr_idx = i
-            break
-    if hdr_idx is None:
-        raise ValueError(f"Could not locate header row in {sheet}")
-
-    df.columns = [str(v).strip() if pd.notna(v) else f"_col{j}" for j, v in enumerate(df.iloc[hdr_idx])]
-    df = df.iloc[hdr_idx + 1:].copy()
-    df = df.rename(columns={"DATE": "date"})
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    df = df.dropna(subset=["date"])
-
-    if "Global" not in df.columns:
+def _parse_aqr_country_factor(xls: pd.ExcelFile, sheet: str, col_name: str) -> pd.DataFrame:
+    out = _scan_and_read(xls, sheet, ("DATE", "GLOBAL"), {"Global": col_name})
+    if col_name not in out.columns:
         raise ValueError(f"'Global' column not found in {sheet}")
-
-    out = df[["date", "Global"]].rename(columns={"Global": col_name})
-    out[col_name] = pd.to_numeric(out[col_name], errors="coerce")
-    out["date"] = out["date"].dt.to_period("M").dt.to_timestamp("M")
-    return out.sort_values("date").reset_index(drop=True)
+    return out
 
 
 def _fetch_aqr_factors(start: str = "2002-01-01") -> pd.DataFrame:
-    merged = pd.DataFrame()
+    parts: list[pd.DataFrame] = []
     errors: list[str] = []
 
-    for key in ("tsmom", "vme", "qmj", "bab"):
+    keys = ("tsmom", "vme", "qmj", "bab")
+    with _http_session(len(keys)) as session, ThreadPoolExecutor(max_workers=len(keys)) as ex:
+        downloads = {
+            key: ex.submit(_download_to_tempfile, session, _AQR_URLS[key], ".xlsx")
+            for key in keys
+        }
+
+    for key in keys:
+        path = None
         try:
-            r = requests.get(_AQR_URLS[key], timeout=60)
-            r.raise_for_status()
-            if key == "tsmom":
-                part = _parse_aqr_tsmom(r.content)
-            elif key == "vme":
-                part = _parse_aqr_vme(r.content)
-            elif key == "qmj":
-                part = _parse_aqr_country_factor(r.content, "QMJ Factors", "qmj_global")
-            else:
-                part = _parse_aqr_country_factor(r.content, "BAB Factors", "bab_global")
-
-            merged = part if merged.empty else merged.merge(part, on="date", how="outer")
+            path = downloads[key].result()
+            with pd.ExcelFile(path, engine="calamine") as xls:
+                if key == "tsmom":
+                    part = _parse_aqr_tsmom(xls)
+                elif key == "vme":
+                    part = _parse_aqr_vme(xls)
+                elif key == "qmj":
+                    part = _parse_aqr_country_factor(xls, "QMJ Factors", "qmj_global")
+                else:
+                    part = _parse_aqr_country_factor(xls, "BAB Factors", "bab_global")
+
+            parts.append(part)
         except Exception as exc:
             errors.append(f"{key}: {type(exc).__name__}: {exc}")
+        finally:
+            if path is not None:
+                path.unlink(missing_ok=True)
 
     if errors:
         print(f"[data_prep] AQR fetch warnings: {'; '.join(errors)}")
+    merged = _outer_join_on_date(parts)
     if merged.empty:
-        return pd.DataFrame(columns=["date"])
-    return merged[merged["date"] >= pd.Timestamp(start)].sort_values("date").reset_index(drop=True)
+        return merged
+    return merged[merged["date"] >= pd.Timestamp(start)].reset_index(drop=True)
 
 
 # ── JKP (local-only) ───────────────────────────────────────────────────────
@@ -268,7 +353,7 @@ def _load_jkp_local(data_dir: Path) -> pd.DataFrame:
         raise ValueError("JKP CSV missing 'date' column")
     df["date"] = pd.to_datetime(df["date"], errors="coerce")
     df = df.dropna(subset=["date"]).sort_values("date").reset_index(drop=True)
-    df["date"] = df["date"].dt.to_period("M").dt.to_timestamp("M")
+    df["date"] = _to_month_end(df["date"])
     return df
 
 
@@ -297,7 +382,7 @@ def fetch_all_external_factors(start: str = "2002-01-01",
     # --- FRED ---
     fred_cache = cache_dir / "fred_factors_monthly.csv" if cache_dir else None
     try:
-        fred = _fetch_fred_factors(start=start)
+        fred = _fetch_fred_factors(start=start, cache_dir=cache_dir)
         if fred_cache:
             fred.to_csv(fred_cache, index=False)
     except Exception as e:
@@ -333,16 +418,9 @@ def fetch_all_external_factors(start: str = "2002-01-01",
             warnings.append(f"JKP local load failed: {exc}")
 
     # --- Merge ---
-    out = fred.copy() if not fred.empty else pd.DataFrame(columns=["date"])
-    for part in (aqr, jkp):
-        if not part.empty and "date" in part.columns:
-            if out.empty or "date" not in out.columns or len(out) == 0:
-                out = part
-            else:
-                out = out.merge(part, on="date", how="outer")
-
-    if not out.empty and "date" in out.columns:
-        out = out[out["date"] >= pd.Timestamp(start)].sort_values("date").reset_index(drop=True)
+    out = _outer_join_on_date([fred, aqr, jkp])
+    if not out.empty:
+        out = out[out["date"] >= pd.Timestamp(start)].reset_index(drop=True)
 
     if warnings:
         for w in warnings:
@@ -351,18 +429,15 @@ def fetch_all_external_factors(start: str = "2002-01-01",
     return out
 
 
-def fetch_hfgm_monthly_returns(start: str = "2022-01-01") -> pd.DataFrame:
-    h = yf.download("HFGM", start=start, auto_adjust=True, progress=False)
+def fetch_hfgm_monthly_returns(start: str = "2022-01-01",
+                               cache_dir: Path | None = None) -> pd.DataFrame:
+    h = _cached_yf("HFGM", start=start, cache_dir=cache_dir)
     if h.empty:
         return pd.DataFrame(columns=["date", "hfgm_ret"])
     close = h["Close"].iloc[:, 0] if isinstance(h.columns, pd.MultiIndex) else h["Close"]
-    close = close.rename("close").to_frame()
-    close.index = pd.to_datetime(close.index)
-    close["date"] = close.index.to_period("M").to_timestamp("M")
     out = (
-        close.groupby("date", as_index=False)["close"]
-        .last()
-        .assign(hfgm_ret=lambda x: x["close"].pct_change())[["date", "hfgm_ret"]]
+        _last_per_month(close.rename("close"))
+        .assign(hfgm_ret=lambda x: _pct_change(x["close"]))[["date", "hfgm_ret"]]
         .dropna()
         .reset_index(drop=True)
     )
@@ -4,9 +4,19 @@
 
 from __future__ import annotations
 
+import jinja2
 import numpy as np
 import pandas as pd
 import statsmodels.api as sm
+from scipy.linalg import lstsq
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the kernels below also run as plain NumPy
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda fn: fn
 
 
 # ── OLS helpers ─────────────────────────────────────────────────────────────
@@ -17,19 +27,65 @@ def fit_ols(y: pd.Series, x: pd.DataFrame):
     return model
 
 
-def regression_diagnostics(model, y: pd.Series, x: pd.DataFrame) -> dict:
-    x_with_const = sm.add_constant(x, has_constant="add")
-    y_hat = model.predict(x_with_const)
+def fit_ols_fast(y, x) -> tuple[np.ndarray, float, int]:
+    """Intercept + slopes, SSR and design rank from a bare LAPACK least-squares solve.
+
+    No standard errors or result wrapper; use ``fit_ols`` when p-values are needed.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    x = np.asarray(x, dtype=np.float64).reshape(len(y), -1)
+    X = np.c_[np.ones(len(y)), x]
+    # Same singular-value cutoff as np.linalg.matrix_rank (used by statsmodels).
+    cond = max(X.shape) * np.finfo(np.float64).eps
+    beta, _, rank, _ = lstsq(X, y, cond=cond, lapack_driver="gelsd")
+    resid = y - X @ beta
+    return beta, float(resid @ resid), int(rank)
+
+
+@njit(cache=True, fastmath=True)
+def adj_r2_kernel(X, y):
+    """Adjusted R² of y on X (column 0 the constant) in one compiled kernel.
+
+    Gram build, solve and SSR = yᵀy − βᵀXᵀy are fused; the residuals are never
+    formed.  Raises ``LinAlgError`` when XᵀX is singular.
+    """
+    n, p = X.shape
+    XtX = X.T @ X
+    Xty = X.T @ y
+    beta = np.linalg.solve(XtX, Xty)
+    yty = y @ y
+    ssr = yty - beta @ Xty
+    sst = yty - Xty[0] * Xty[0] / n
+    return 1.0 - (ssr / sst) * (n - 1) / (n - p)
+
+
+@njit(cache=True, fastmath=True)
+def _diag_kernel(y, y_hat):
+    """Residual std (ddof=1) and corr(fitted, actual) from one fused pass."""
     resid = y - y_hat
+    r_c = resid - resid.mean()
+    y_c = y - y.mean()
+    f_c = y_hat - y_hat.mean()
+    resid_std = np.sqrt((r_c @ r_c) / (y.shape[0] - 1))
+    corr = (y_c @ f_c) / np.sqrt((y_c @ y_c) * (f_c @ f_c))
+    return resid_std, corr
+
+
+def regression_diagnostics(model) -> dict:
+    """Fit statistics read off a fitted ``fit_ols`` result (no re-prediction)."""
+    resid_std, corr = _diag_kernel(
+        np.ascontiguousarray(model.model.endog, dtype=np.float64),
+        np.ascontiguousarray(model.fittedvalues, dtype=np.float64),
+    )
     return {
         "n_obs": int(model.nobs),
         "r2": float(model.rsquared),
         "adj_r2": float(model.rsquared_adj),
         "alpha_monthly": float(model.params.get("const", np.nan)),
         "alpha_annualized": float((1.0 + model.params.get("const", 0.0)) ** 12 - 1.0),
-        "resid_vol_monthly": float(resid.std(ddof=1)),
-        "resid_vol_annualized": float(resid.std(ddof=1) * np.sqrt(12.0)),
-        "corr_fitted_actual": float(np.corrcoef(y, y_hat)[0, 1]),
+        "resid_vol_monthly": float(resid_std),
+        "resid_vol_annualized": float(resid_std * np.sqrt(12.0)),
+        "corr_fitted_actual": float(corr),
     }
 
 
@@ -45,16 +101,20 @@ def coef_table(model) -> pd.DataFrame:
 
 def to_md_table(df: pd.DataFrame, digits: int = 4) -> str:
     """Convert a DataFrame to a GitHub-flavoured markdown table."""
-    data = df.copy()
-    for c in data.columns:
-        if pd.api.types.is_numeric_dtype(data[c]):
-            data[c] = data[c].map(lambda x: f"{x:.{digits}f}" if pd.notna(x) else "")
+    data = df.astype(object)
+    num_cols = [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c])]
+    if num_cols and not df.empty:
+        # Format every numeric cell in one vectorised pass; NaNs render as "".
+        vals = df[num_cols].to_numpy(dtype=np.float64)
+        text = np.char.mod(f"%.{digits}f", vals).astype(object)
+        text[np.isnan(vals)] = ""
+        data[num_cols] = text
     header = "| " + " | ".join(data.columns.astype(str)) + " |"
     sep = "| " + " | ".join(["---"] * len(data.columns)) + " |"
-    body = [
-        "| " + " | ".join(str(v) for v in row) + " |"
-        for row in data.astype(str).itertuples(index=False, name=None)
-    ]
+    if data.empty:
+        return "\n".join([header, sep])
+    cells = data.where(data.notna(), "").astype(str)
+    body = ("| " + cells.iloc[:, 0].str.cat(cells.iloc[:, 1:], sep=" | ") + " |").tolist()
     return "\n".join([header, sep] + body)
 
 
@@ -76,44 +136,28 @@ FACTOR_DESC: dict[str, str] = {
 }
 
 
+class _BulletLines(dict):
+    """factor -> rendered bullet line; unknown factors describe themselves."""
+
+    def __missing__(self, f: str) -> str:
+        line = self[f] = f"- **`{f}`**: {FACTOR_DESC.get(f, f)}"
+        return line
+
+
+# Bullet lines for every known factor are rendered once, at import.
+_DESC = _BulletLines({f: f"- **`{f}`**: {d}" for f, d in FACTOR_DESC.items()})
+
+
 def factor_bullets(factors: list[str]) -> str:
     """Markdown bullet list describing each factor."""
-    return "\n".join(f"- **`{f}`**: {FACTOR_DESC.get(f, f)}" for f in factors)
+    return "\n".join([_DESC[f] for f in factors])
 
 
 # ── Report builder ──────────────────────────────────────────────────────────
 
-def build_report(
-    *,
-    date_min: str,
-    date_max: str,
-    n_months: int,
-    n_ext_factors: int,
-    ff5_diag: dict,
-    ff5_coef: pd.DataFrame,
-    ff5_alpha_p: float,
-    econ_factors: list[str],
-    econ_coef: pd.DataFrame,
-    econ_diag: dict,
-    greedy_factors: list[str],
-    greedy_coef: pd.DataFrame,
-    greedy_diag: dict,
-    ff5_same_diag: dict,
-    compare_tbl: pd.DataFrame,
-    n_candidates: int,
-    live_stats: pd.DataFrame,
-    live_overlap: pd.DataFrame,
-    live_note: str,
-) -> str:
-    """Assemble the full markdown analysis report from pre-computed results."""
-    alpha_sig = (
-        "statistically significant" if ff5_alpha_p < 0.05
-        else "not statistically significant"
-    )
-    econ_delta = econ_diag["adj_r2"] - ff5_same_diag["adj_r2"]
-    greedy_delta = greedy_diag["adj_r2"] - ff5_same_diag["adj_r2"]
-
-    md = f"""# CS Global Macro Index (2x Vol, Net 95bps): Factor Attribution
+# Compiled once at import; build_report only renders it.
+_REPORT_TEMPLATE = jinja2.Template(
+    """# CS Global Macro Index (2x Vol, Net 95bps): Factor Attribution
 
 > Factor sources: **Fama-French 5**, **FRED** (USD, 10Y, HY OAS, GSCI),
 > **AQR Data Library** (TSMOM, Value & Momentum Everywhere, QMJ, BAB).
@@ -123,9 +167,9 @@ def build_report(
 
 ## Data Overview
 
-- Fund: **{date_min}** to **{date_max}** ({n_months} months).
+- Fund: **{{ date_min }}** to **{{ date_max }}** ({{ n_months }} months).
 - FF5: daily returns compounded to monthly (`mkt_rf`, `smb`, `hml`, `rmw`, `cma`, `rf`).
-- External factors: {n_ext_factors} series from FRED + AQR.
+- External factors: {{ n_ext_factors }} series from FRED + AQR.
 
 ## Is FF5 a Good Benchmark?
 
@@ -138,13 +182,13 @@ credit, and trend-following.
 
 ### Fit and alpha
 
-{to_md_table(pd.DataFrame([ff5_diag]))}
+{{ ff5_diag_md }}
 
-Alpha is **{alpha_sig}** at 5% (p = {ff5_alpha_p:.4f}).
+Alpha is **{{ alpha_sig }}** at 5% (p = {{ ff5_alpha_p }}).
 
 ### FF5 exposures
 
-{to_md_table(ff5_coef)}
+{{ ff5_coef_md }}
 
 The fund has equity beta, but FF5 explainability is limited (adj-R² is modest).
 Residual risk is large, pointing to exposures outside equity style factors.
@@ -157,26 +201,26 @@ Residual risk is large, pointing to exposures outside equity style factors.
 
 Hand-picked factors reflecting global macro strategy exposures:
 
-{factor_bullets(econ_factors)}
+{{ econ_bullets }}
 
-{to_md_table(econ_coef)}
+{{ econ_coef_md }}
 
 ### Model B — Greedy Best-Fit Model
 
-Factors selected by forward stepwise adj-R² maximisation from all {n_candidates} candidates:
+Factors selected by forward stepwise adj-R² maximisation from all {{ n_candidates }} candidates:
 
-{factor_bullets(greedy_factors)}
+{{ greedy_bullets }}
 
-{to_md_table(greedy_coef)}
+{{ greedy_coef_md }}
 
 ---
 
 ## Model Comparison (overlapping window)
 
-{to_md_table(compare_tbl)}
+{{ compare_md }}
 
-- Economist model vs FF5: **{econ_delta:+.4f}** adj-R²
-- Greedy model vs FF5: **{greedy_delta:+.4f}** adj-R²
+- Economist model vs FF5: **{{ econ_delta }}** adj-R²
+- Greedy model vs FF5: **{{ greedy_delta }}** adj-R²
 
 ## Why These Factors Make Sense for Global Macro
 
@@ -212,15 +256,14 @@ volatility risk premium).
 
 ## Extra Credit: Backtest vs Live (HFGM)
 
-"""
+{% if live_stats_md %}
+{{ live_stats_md }}
 
-    if not live_stats.empty:
-        md += to_md_table(live_stats) + "\n\n"
-        md += to_md_table(live_overlap[["date", "fund_ret", "hfgm_ret", "spread"]]) + "\n"
-    else:
-        md += f"- {live_note or 'Live comparison unavailable.'}\n"
+{{ live_overlap_md }}
+{% else %}
+- {{ live_note }}
+{% endif %}
 
-    md += """
 ## Bottom Line
 
 - FF5 alone is **not** a fully appropriate benchmark for this global macro fund.
@@ -228,5 +271,63 @@ volatility risk premium).
   alongside FRED macro proxies substantially improves explainability.
 - The covariance structure of the proposed models aligns with the economic
   narrative of a multi-asset, trend-aware macro strategy.
-"""
-    return md
+""",
+    trim_blocks=True,
+    keep_trailing_newline=True,
+)
+
+
+def build_report(
+    *,
+    date_min: str,
+    date_max: str,
+    n_months: int,
+    n_ext_factors: int,
+    ff5_diag: dict,
+    ff5_coef: pd.DataFrame,
+    ff5_alpha_p: float,
+    econ_factors: list[str],
+    econ_coef: pd.DataFrame,
+    econ_diag: dict,
+    greedy_factors: list[str],
+    greedy_coef: pd.DataFrame,
+    greedy_diag: dict,
+    ff5_same_diag: dict,
+    compare_tbl: pd.DataFrame,
+    n_candidates: int,
+    live_stats: pd.DataFrame,
+    live_overlap: pd.DataFrame,
+    live_note: str,
+) -> str:
+    """Assemble the full markdown analysis report from pre-computed results."""
+    alpha_sig = (
+        "statistically significant" if ff5_alpha_p < 0.05
+        else "not statistically significant"
+    )
+    econ_delta = econ_diag["adj_r2"] - ff5_same_diag["adj_r2"]
+    greedy_delta = greedy_diag["adj_r2"] - ff5_same_diag["adj_r2"]
+
+    ctx = {
+        "date_min": date_min,
+        "date_max": date_max,
+        "n_months": n_months,
+        "n_ext_factors": n_ext_factors,
+        "ff5_diag_md": to_md_table(pd.DataFrame([ff5_diag])),
+        "alpha_sig": alpha_sig,
+        "ff5_alpha_p": f"{ff5_alpha_p:.4f}",
+        "ff5_coef_md": to_md_table(ff5_coef),
+        "econ_bullets": factor_bullets(econ_factors),
+        "econ_coef_md": to_md_table(econ_coef),
+        "n_candidates": n_candidates,
+        "greedy_bullets": factor_bullets(greedy_factors),
+        "greedy_coef_md": to_md_table(greedy_coef),
+        "compare_md": to_md_table(compare_tbl),
+        "econ_delta": f"{econ_delta:+.4f}",
+        "greedy_delta": f"{greedy_delta:+.4f}",
+        "live_stats_md": "" if live_stats.empty else to_md_table(live_stats),
+        "live_overlap_md": "" if live_stats.empty else to_md_table(
+            live_overlap[["date", "fund_ret", "hfgm_ret", "spread"]]
+        ),
+        "live_note": live_note or "Live comparison unavailable.",
+    }
+    return _REPORT_TEMPLATE.render(**ctx)
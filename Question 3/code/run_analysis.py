@@ -16,16 +16,25 @@ Runs the full pipeline:
   6. (Extra credit) Backtest vs live HFGM ETF.
   7. Write all outputs to ``data/output_data/``.
 
+Steps 1 and 3 are memoised in ``data/output_data/merged_<key>.npz``, keyed on
+the input files' mtimes and today's date, so re-runs on the same day skip the
+xlsx parse and the FRED/AQR downloads.
+
 Usage (from the Question 3 folder):
     python code/run_analysis.py
 """
 
 from __future__ import annotations
 
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pac
 
 from data_prep import (
     fetch_all_external_factors,
@@ -34,9 +43,11 @@ from data_prep import (
     load_fund_monthly_returns,
 )
 from model_utils import (
+    adj_r2_kernel,
     build_report,
     coef_table,
     fit_ols,
+    fit_ols_fast,
     regression_diagnostics,
 )
 
@@ -53,6 +64,8 @@ ALL_CANDIDATES = [
     "qmj_global", "bab_global",
 ]
 
+HFGM_TIMEOUT = 120  # seconds to wait for the background HFGM download
+
 ECON_PRIORITY = [
     "mkt_rf", "tsmom", "val_everywhere", "hy_oas_chg", "usd_ret",
     "dgs10_chg", "mom_everywhere", "cmdty_ret",
@@ -64,65 +77,188 @@ def _resolve_input_file(filename: str) -> Path:
     return data_path if data_path.exists() else CODE_DIR / filename
 
 
+def _write_csv(df: pd.DataFrame, path: Path) -> None:
+    """Write *df* (no index) with Arrow's C++ CSV writer; dates as YYYY-MM-DD."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    for i, field in enumerate(table.schema):
+        if pa.types.is_timestamp(field.type):
+            table = table.set_column(i, field.name, table.column(i).cast(pa.date32()))
+    pac.write_csv(table, path)
+
+
+def _cacheable(df: pd.DataFrame) -> bool:
+    """True if *df* is a non-empty datetime ``date`` column plus numeric columns."""
+    if df.empty or "date" not in df.columns or not pd.api.types.is_datetime64_dtype(df["date"]):
+        return False
+    return all(pd.api.types.is_numeric_dtype(df[c]) for c in df.columns if c != "date")
+
+
+def _load_cached_matrix(paths: list[Path], build) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Return ``build()`` -> (core, ext), memoised as a single ``.npz``.
+
+    Each frame is stored as a float matrix plus its column names and dates.
+    Frames that are empty or hold non-numeric columns are not cached, and an
+    unreadable cache file is rebuilt rather than raised.
+    """
+    stamp = [str(date.today())] + [f"{p.name}:{p.stat().st_mtime_ns}" for p in paths if p.exists()]
+    key = hashlib.sha1("|".join(stamp).encode()).hexdigest()[:16]
+    cache_path = OUTPUT_DIR / f"merged_{key}.npz"
+    if cache_path.exists():
+        try:
+            frames = []
+            with np.load(cache_path) as z:
+                for name in ("core", "ext"):
+                    df = pd.DataFrame(z[f"{name}_values"], columns=z[f"{name}_columns"].tolist())
+                    df.insert(0, "date", z[f"{name}_dates"])
+                    frames.append(df)
+            return frames[0], frames[1]
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[run_analysis] ignoring unreadable cache {cache_path.name} ({e}).")
+    frames = build()
+    for stale in OUTPUT_DIR.glob("merged_*.npz"):
+        stale.unlink()
+    if not all(_cacheable(df) for df in frames):
+        return frames
+    arrays = {}
+    for name, df in zip(("core", "ext"), frames):
+        num = df.drop(columns="date")
+        arrays[f"{name}_values"] = num.to_numpy(dtype=np.float64)
+        arrays[f"{name}_columns"] = np.array(num.columns, dtype=str)
+        arrays[f"{name}_dates"] = df["date"].to_numpy()
+    np.savez_compressed(cache_path, **arrays)
+    return frames
+
+
+def _abs_corr(a: np.ndarray, b: np.ndarray) -> float:
+    """|Pearson correlation| over rows where both are observed (0 if undefined)."""
+    ok = ~(np.isnan(a) | np.isnan(b))
+    if ok.sum() < 3:
+        return 0.0
+    a, b = a[ok] - a[ok].mean(), b[ok] - b[ok].mean()
+    denom = np.sqrt((a @ a) * (b @ b))
+    return float(abs(a @ b) / denom) if denom > 0 else 0.0
+
+
 def _pick_best_model(fund_excess: pd.Series, candidate_df: pd.DataFrame,
                      all_candidates: list[str], min_obs: int = 60,
-                     min_factors: int = 3, max_factors: int = 5) -> list[str]:
-    """Greedy forward selection maximising adj-R²."""
+                     min_factors: int = 3, max_factors: int = 5,
+                     top_k: int = 5) -> list[str]:
+    """Greedy forward selection maximising adj-R².
+
+    At each step only the *top_k* remaining candidates with at least
+    *min_obs* usable rows that are most correlated (in absolute value) with
+    the current model's residual are trialled.  This screen is a heuristic:
+    the adj-R²-maximising candidate is not always among them, so it can
+    change the selected factors.  Pass ``top_k=len(all_candidates)`` to
+    restore the exhaustive search.
+    Trials are scored by the compiled ``adj_r2_kernel``,
+    falling back to ``fit_ols_fast`` for collinear trials; statsmodels is
+    only used for the final fit in ``main``.
+    """
     available = [c for c in all_candidates if c in candidate_df.columns
                  and candidate_df[c].notna().sum() > min_obs]
-    chosen: list[str] = []
+    # Kept in float64: adj_r2_kernel forms SSR = yᵀy − βᵀXᵀy, which cancels
+    # badly in float32 and could flip near-tied candidates.
+    avail_arr = candidate_df[available].to_numpy(dtype=np.float64)
+    notna = ~np.isnan(avail_arr)
+    y = fund_excess.to_numpy(dtype=np.float64)
+    y_mask = ~np.isnan(y)
+    chosen: list[int] = []
     for _ in range(max_factors):
+        if chosen:
+            base = y_mask & notna[:, chosen].all(axis=1)
+            x_base = avail_arr[np.ix_(base, chosen)]
+            beta, _, _ = fit_ols_fast(y[base], x_base)
+            resid = np.full_like(y, np.nan)
+            resid[base] = y[base] - beta[0] - x_base @ beta[1:]
+        else:
+            resid = y - np.nanmean(y)
+        # Apply the min_obs rule before ranking, so the screen only keeps
+        # candidates that can actually be trialled.
+        row_masks = {}
+        for c in range(len(available)):
+            if c not in chosen:
+                mask = y_mask & notna[:, chosen + [c]].all(axis=1)
+                if mask.sum() >= min_obs:
+                    row_masks[c] = mask
+        eligible = list(row_masks)
+        scores = np.array([_abs_corr(resid, avail_arr[:, c]) for c in eligible])
+        shortlist = [eligible[i] for i in np.argsort(-scores, kind="stable")[:top_k]]
+
         best_r2, best_col = -np.inf, None
-        for c in available:
-            if c in chosen:
-                continue
-            trial = chosen + [c]
-            tmp = candidate_df[["fund_excess"] + trial].dropna()
-            if len(tmp) < min_obs:
-                continue
-            ar2 = float(fit_ols(tmp["fund_excess"], tmp[trial]).rsquared_adj)
+        for c in shortlist:
+            idx = chosen + [c]
+            row_mask = row_masks[c]
+            n = int(row_mask.sum())
+            x_t = avail_arr[np.ix_(row_mask, idx)]
+            y_t = y[row_mask]
+            X = np.column_stack([np.ones(n), x_t])
+            full_rank = np.linalg.matrix_rank(X) == X.shape[1]
+            if full_rank:
+                try:
+                    ar2 = adj_r2_kernel(X, y_t)
+                except np.linalg.LinAlgError:
+                    full_rank = False
+            if not full_rank:
+                # Collinear trial: the normal equations do not reliably fail
+                # (or raise) here, so score it with the rank-revealing lstsq
+                # solve and take the residual df from the rank, as in
+                # statsmodels' rsquared_adj.
+                _, ssr, rank = fit_ols_fast(y_t, x_t)
+                sst = float(((y_t - y_t.mean()) ** 2).sum())
+                ar2 = 1.0 - (ssr / sst) * (n - 1) / (n - rank)
             if ar2 > best_r2:
                 best_r2, best_col = ar2, c
         if best_col is None:
             break
         chosen.append(best_col)
     if len(chosen) < min_factors:
-        chosen = available[:min_factors] if len(available) >= min_factors else available
-    return chosen
+        return available[:min_factors] if len(available) >= min_factors else available
+    return [available[i] for i in chosen]
 
 
 def main() -> None:
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
+    # The HFGM download (step 7) is network-bound; start it now so it
+    # overlaps the loading and regression work.
+    hfgm_pool = ThreadPoolExecutor(max_workers=1)
+    hfgm_future = hfgm_pool.submit(
+        fetch_hfgm_monthly_returns, start="2022-01-01", cache_dir=OUTPUT_DIR,
+    )
+    hfgm_pool.shutdown(wait=False)
+
     fund_xlsx = _resolve_input_file(
         "CS Global Macro Index at 2x Vol Net of 95bps 2025.09.xlsx"
     )
     ff5_parquet = _resolve_input_file("ff.five_factor.parquet")
 
-    # ── 1) Load local data ──────────────────────────────────────────────
-    fund = load_fund_monthly_returns(fund_xlsx)
-    ff5 = load_ff5_monthly(ff5_parquet)
-    core = fund.merge(ff5, on="date", how="inner").sort_values("date").reset_index(drop=True)
-    core["fund_excess"] = core["fund_ret"] - core["rf"]
+    # ── 1) Load local data + external factors (FRED + AQR, cached) ─────
+    def build_inputs() -> tuple[pd.DataFrame, pd.DataFrame]:
+        fund = load_fund_monthly_returns(fund_xlsx)
+        ff5 = load_ff5_monthly(ff5_parquet)
+        core = fund.merge(ff5, on="date", how="inner", sort=True)
+        core["fund_excess"] = core["fund_ret"] - core["rf"]
+        ext = fetch_all_external_factors(
+            start=str(core["date"].min().date()),
+            cache_dir=OUTPUT_DIR,
+            data_dir=DATA_DIR,
+        )
+        return core, ext
+
+    core, ext = _load_cached_matrix(
+        [fund_xlsx, ff5_parquet, DATA_DIR / "jkp_theme_factors_monthly.csv"], build_inputs,
+    )
 
-    # ── 2) FF5 regression ───────────────────────────────────────────────
+    # ── 2) FF5 regression (fitted with the other models in step 6) ─────
     ff5_factors = ["mkt_rf", "smb", "hml", "rmw", "cma"]
-    ff5_model = fit_ols(core["fund_excess"], core[ff5_factors])
-    ff5_diag = regression_diagnostics(ff5_model, core["fund_excess"], core[ff5_factors])
-    ff5_coef = coef_table(ff5_model).reset_index().rename(columns={"index": "factor"})
 
-    # ── 3) Fetch external factors (FRED + AQR, cached fallback) ─────────
-    ext = fetch_all_external_factors(
-        start=str(core["date"].min().date()),
-        cache_dir=OUTPUT_DIR,
-        data_dir=DATA_DIR,
-    )
-    ext.to_csv(OUTPUT_DIR / "external_factors_monthly.csv", index=False)
+    # ── 3) External factors ─────────────────────────────────────────────
+    _write_csv(ext, OUTPUT_DIR / "external_factors_monthly.csv")
     print(f"External factors: {len(ext)} rows, {len(ext.columns)} columns.")
 
     # ── 4) Merge into analysis frame ────────────────────────────────────
-    macro = core.merge(ext, on="date", how="left")
-    macro["fund_excess"] = macro["fund_ret"] - macro["rf"]
+    macro = core.merge(ext, on="date", how="left")  # carries core's fund_excess
 
     # ── 5a) Economist's model (hand-picked, ≤ 5) ───────────────────────
     econ_avail = [c for c in ECON_PRIORITY
@@ -130,24 +266,37 @@ def main() -> None:
     econ_factors = econ_avail[:5] if len(econ_avail) >= 5 else econ_avail[:max(3, len(econ_avail))]
 
     econ_df = macro[["date", "fund_excess"] + econ_factors].dropna().reset_index(drop=True)
-    econ_model = fit_ols(econ_df["fund_excess"], econ_df[econ_factors])
-    econ_diag = regression_diagnostics(econ_model, econ_df["fund_excess"], econ_df[econ_factors])
-    econ_coef = coef_table(econ_model).reset_index().rename(columns={"index": "factor"})
 
     # ── 5b) Greedy best-fit model ───────────────────────────────────────
     greedy_factors = _pick_best_model(
         macro["fund_excess"], macro, ALL_CANDIDATES, min_factors=3, max_factors=5,
     )
     greedy_df = macro[["date", "fund_excess"] + greedy_factors].dropna().reset_index(drop=True)
-    greedy_model = fit_ols(greedy_df["fund_excess"], greedy_df[greedy_factors])
-    greedy_diag = regression_diagnostics(greedy_model, greedy_df["fund_excess"], greedy_df[greedy_factors])
-    greedy_coef = coef_table(greedy_model).reset_index().rename(columns={"index": "factor"})
 
     # ── 6) Fair-window FF5 comparison ───────────────────────────────────
-    all_dates = set(econ_df["date"]) | set(greedy_df["date"])
-    ff5_same = core[core["date"].isin(all_dates)].dropna(subset=["fund_excess"] + ff5_factors)
-    ff5_same_model = fit_ols(ff5_same["fund_excess"], ff5_same[ff5_factors])
-    ff5_same_diag = regression_diagnostics(ff5_same_model, ff5_same["fund_excess"], ff5_same[ff5_factors])
+    def date_keys(d: pd.Series) -> np.ndarray:
+        return d.to_numpy(dtype="datetime64[ns]").view("i8")
+
+    all_dates = np.union1d(date_keys(econ_df["date"]), date_keys(greedy_df["date"]))
+    in_window = np.isin(date_keys(core["date"]), all_dates, assume_unique=False)
+    ff5_same = core.loc[in_window].dropna(subset=["fund_excess"] + ff5_factors)
+
+    # The four fits are independent; run them on a thread pool (the LAPACK
+    # solves release the GIL).
+    def fit(df: pd.DataFrame, factors: list[str]):
+        model = fit_ols(df["fund_excess"], df[factors])
+        return model, regression_diagnostics(model)
+
+    with ThreadPoolExecutor(max_workers=4) as ex:
+        futures = [ex.submit(fit, df, factors) for df, factors in (
+            (core, ff5_factors), (econ_df, econ_factors),
+            (greedy_df, greedy_factors), (ff5_same, ff5_factors),
+        )]
+        ((ff5_model, ff5_diag), (econ_model, econ_diag),
+         (greedy_model, greedy_diag), (ff5_same_model, ff5_same_diag)) = [f.result() for f in futures]
+    ff5_coef = coef_table(ff5_model).reset_index().rename(columns={"index": "factor"})
+    econ_coef = coef_table(econ_model).reset_index().rename(columns={"index": "factor"})
+    greedy_coef = coef_table(greedy_model).reset_index().rename(columns={"index": "factor"})
 
     diag_keys = ["n_obs", "adj_r2", "alpha_monthly", "alpha_annualized",
                  "resid_vol_annualized", "corr_fitted_actual"]
@@ -162,15 +311,16 @@ def main() -> None:
     live_stats = pd.DataFrame()
     live_overlap = pd.DataFrame()
     try:
-        hfgm = fetch_hfgm_monthly_returns(start="2022-01-01")
-        hfgm.to_csv(OUTPUT_DIR / "hfgm_monthly_returns.csv", index=False)
+        hfgm = hfgm_future.result(timeout=HFGM_TIMEOUT)
+        _write_csv(hfgm, OUTPUT_DIR / "hfgm_monthly_returns.csv")
         live = core[["date", "fund_ret"]].merge(hfgm, on="date", how="inner").dropna()
         if len(live) >= 4:
-            corr = float(live["fund_ret"].corr(live["hfgm_ret"]))
-            beta = float(
-                np.cov(live["hfgm_ret"], live["fund_ret"], ddof=1)[0, 1]
-                / np.var(live["fund_ret"], ddof=1)
-            )
+            fr = live["fund_ret"].to_numpy(dtype=np.float64)
+            hr = live["hfgm_ret"].to_numpy(dtype=np.float64)
+            fr_c, hr_c = fr - fr.mean(), hr - hr.mean()
+            sxy, sxx, syy = fr_c @ hr_c, fr_c @ fr_c, hr_c @ hr_c
+            corr = float(sxy / np.sqrt(sxx * syy))
+            beta = float(sxy / sxx)
             spread = live["hfgm_ret"] - live["fund_ret"]
             live_stats = pd.DataFrame([{
                 "overlap_months": len(live),
@@ -179,21 +329,22 @@ def main() -> None:
                 "tracking_error_ann": float(spread.std(ddof=1) * np.sqrt(12.0)),
                 "avg_return_diff_ann": float(((1.0 + spread.mean()) ** 12) - 1.0),
             }])
-            live_overlap = live.copy()
-            live_overlap["spread"] = spread.values
-            live_overlap["date"] = live_overlap["date"].dt.strftime("%Y-%m")
+            live_overlap = live.assign(
+                spread=spread.to_numpy(),
+                date=lambda d: d["date"].dt.strftime("%Y-%m"),
+            )
         else:
             live_note = "Not enough overlap between HFGM and backtest for robust metrics."
     except Exception as e:
         live_note = f"Could not fetch HFGM data ({type(e).__name__}: {e})."
 
     # ── 8) Save CSVs ────────────────────────────────────────────────────
-    ff5_coef.to_csv(OUTPUT_DIR / "ff5_coefficients.csv", index=False)
-    econ_coef.to_csv(OUTPUT_DIR / "econ_model_coefficients.csv", index=False)
-    greedy_coef.to_csv(OUTPUT_DIR / "greedy_model_coefficients.csv", index=False)
-    compare_tbl.to_csv(OUTPUT_DIR / "model_comparison.csv", index=False)
+    _write_csv(ff5_coef, OUTPUT_DIR / "ff5_coefficients.csv")
+    _write_csv(econ_coef, OUTPUT_DIR / "econ_model_coefficients.csv")
+    _write_csv(greedy_coef, OUTPUT_DIR / "greedy_model_coefficients.csv")
+    _write_csv(compare_tbl, OUTPUT_DIR / "model_comparison.csv")
     if not live_stats.empty:
-        live_stats.to_csv(OUTPUT_DIR / "live_vs_backtest_stats.csv", index=False)
+        _write_csv(live_stats, OUTPUT_DIR / "live_vs_backtest_stats.csv")
 
     # ── 9) Markdown report ──────────────────────────────────────────────
     report = build_report(